@@ -2,8 +2,13 @@
 
 from __future__ import annotations
 
+import asyncio
+from dataclasses import dataclass, field
+from functools import partial
 import logging
 import re
+import time
+from typing import TYPE_CHECKING
 
 import aiohttp
 from bs4 import BeautifulSoup
@@ -12,6 +17,20 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 
+from .const import (
+    CONF_REPLAY_PATH,
+    CONF_REPLAY_SPEED,
+    CONF_TRACE_PATH,
+    REPLAY_SPEED_INTERVAL,
+    REPLAY_SPEED_REALTIME,
+)
+from .trace import TraceRecord, TraceRecorder, session_trace_path
+
+if TYPE_CHECKING:
+    from .coordinator import LinceEuronetCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
 _PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR, Platform.SENSOR]
 
 
@@ -25,6 +44,7 @@ class LinceEuronetApi:
         password: str,
         code: str | None = None,
         port: int = 80,
+        recorder: TraceRecorder | None = None,
     ) -> None:
         """Initialize the API with host, username, password, and optional code."""
         self.host = host
@@ -32,23 +52,73 @@ class LinceEuronetApi:
         self.password = password
         self.code = code
         self.port = port
+        self.recorder = recorder
 
     async def async_test_connection(self) -> bool:
         """Simulate testing connection to the device."""
         return True
 
-    async def get_xml(self, payload: str) -> str:
-        """Fetch status.xml."""
-        url = f"http://{self.host}:{self.port}/status.xml"
+    async def async_close(self) -> None:
+        """Release resources held by the API."""
+        if self.recorder is not None:
+            await self.recorder.async_close()
+
+    async def _async_request(
+        self, method: str, path: str, payload: str | None = None
+    ) -> str:
+        """Send a request to the panel and return the decoded response body."""
+        url = f"http://{self.host}:{self.port}/{path}"
         timeout = aiohttp.ClientTimeout(total=10)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            resp_coro = session.post(
-                url,
-                data=payload,
-                auth=aiohttp.BasicAuth(self.username, self.password),
+        started = time.time()
+        start = time.monotonic()
+        try:
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                resp_coro = session.request(
+                    method,
+                    url,
+                    data=payload,
+                    auth=aiohttp.BasicAuth(self.username, self.password),
+                )
+                async with await resp_coro as resp:
+                    body = await resp.read()
+                    encoding = resp.get_encoding()
+                    status = resp.status
+        except (Exception, asyncio.CancelledError) as err:
+            # Failed exchanges are traced too; a cancelled task cannot await
+            if self.recorder is not None:
+                self.recorder.record_nowait(
+                    TraceRecord(
+                        started=started,
+                        elapsed=time.monotonic() - start,
+                        method=method,
+                        path=path,
+                        payload=payload,
+                        status=0,
+                        encoding="",
+                        body=b"",
+                        error=f"{type(err).__name__}: {err}",
+                    )
+                )
+            raise
+        elapsed = time.monotonic() - start
+        if self.recorder is not None:
+            await self.recorder.async_record(
+                TraceRecord(
+                    started=started,
+                    elapsed=elapsed,
+                    method=method,
+                    path=path,
+                    payload=payload,
+                    status=status,
+                    encoding=encoding,
+                    body=body,
+                )
             )
-            async with await resp_coro as resp:
-                xml = await resp.text()
+        return body.decode(encoding)
+
+    async def get_xml(self, payload: str) -> str:
+        """Fetch status.xml."""
+        xml = await self._async_request("POST", "status.xml", payload)
         logging.getLogger(__name__).debug(
             "LinceEuronet: Fetched status.xml with payload '%s'", payload
         )
@@ -56,14 +126,7 @@ class LinceEuronetApi:
 
     async def async_get_ingressi_config(self) -> list[str]:
         """Fetch and parse ingressi-filari.html, return sensor names dynamically."""
-        url = f"http://{self.host}:{self.port}/ingressi-filari.html"
-        timeout = aiohttp.ClientTimeout(total=10)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            resp_coro = session.get(
-                url, auth=aiohttp.BasicAuth(self.username, self.password)
-            )
-            async with await resp_coro as resp:
-                html = await resp.text()
+        html = await self._async_request("GET", "ingressi-filari.html")
         soup = BeautifulSoup(html, "html.parser")
         # Dynamically extract sensor names from the first column
         names = []
@@ -97,30 +160,91 @@ class LinceEuronetApi:
         return in_state
 
 
-type LinceEuronetConfigEntry = ConfigEntry[LinceEuronetApi]
+@dataclass
+class LinceEuronetData:
+    """Runtime data of a Lince Euronet config entry."""
+
+    api: LinceEuronetApi
+    # Each platform registers the coordinator it polls with
+    coordinators: list[LinceEuronetCoordinator] = field(default_factory=list)
+
+
+type LinceEuronetConfigEntry = ConfigEntry[LinceEuronetData]
 
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: LinceEuronetConfigEntry
 ) -> bool:
     """Set up Lince Euronet from a config entry."""
-    # Create API instance using config entry data
-    api = LinceEuronetApi(
-        entry.data["host"],
-        entry.data["username"],
-        entry.data["password"],
-        entry.data.get("code"),
-    )
+    replay_speed = entry.options.get(CONF_REPLAY_SPEED, REPLAY_SPEED_INTERVAL)
+    if replay_path := entry.options.get(CONF_REPLAY_PATH):
+        # Imported here as the replay module builds on LinceEuronetApi
+        from .replay import LinceEuronetReplayApi  # noqa: PLC0415
+
+        # Serve a recorded trace through the normal coordinator and entities
+        api = await hass.async_add_executor_job(
+            partial(
+                LinceEuronetReplayApi.from_file,
+                hass.config.path(replay_path),
+                host=entry.data["host"],
+                realtime=replay_speed == REPLAY_SPEED_REALTIME,
+            )
+        )
+        if api.exhausted:
+            _LOGGER.error("LinceEuronet: No trace records found at '%s'", replay_path)
+            return False
+        _LOGGER.warning(
+            "LinceEuronet: Replaying '%s' instead of polling %s; entity states "
+            "and history come from the trace, not the panel",
+            replay_path,
+            entry.data["host"],
+        )
+        if entry.options.get(CONF_TRACE_PATH):
+            _LOGGER.warning("LinceEuronet: Trace recording is disabled during replay")
+    else:
+        # Record panel traffic for offline replay when a trace path is configured
+        recorder = None
+        if trace_path := entry.options.get(CONF_TRACE_PATH):
+            recorder = TraceRecorder(session_trace_path(hass.config.path(trace_path)))
+            _LOGGER.info("LinceEuronet: Recording trace to '%s'", recorder.path)
+        # Create API instance using config entry data
+        api = LinceEuronetApi(
+            entry.data["host"],
+            entry.data["username"],
+            entry.data["password"],
+            entry.data.get("code"),
+            recorder=recorder,
+        )
     # Simulate connection test
     if not await api.async_test_connection():
         return False
-    entry.runtime_data = api
+    entry.runtime_data = LinceEuronetData(api)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
     await hass.config_entries.async_forward_entry_setups(entry, _PLATFORMS)
+    if replay_path and replay_speed != REPLAY_SPEED_INTERVAL:
+        # Drive all coordinators through the trace instead of their timers
+        from .replay import async_replay  # noqa: PLC0415
+
+        entry.async_create_background_task(
+            hass,
+            async_replay(entry.runtime_data.coordinators),
+            "lince_euronet_replay",
+        )
     return True
 
 
+async def _async_update_listener(
+    hass: HomeAssistant, entry: LinceEuronetConfigEntry
+) -> None:
+    """Reload the entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(
     hass: HomeAssistant, entry: LinceEuronetConfigEntry
 ) -> bool:
     """Unload a config entry."""
-    return await hass.config_entries.async_unload_platforms(entry, _PLATFORMS)
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, _PLATFORMS)
+    if unload_ok:
+        await entry.runtime_data.api.async_close()
+    return unload_ok
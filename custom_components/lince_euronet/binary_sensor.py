@@ -134,8 +134,9 @@ async def async_setup_entry(
     async_add_entities: AddConfigEntryEntitiesCallback,
 ) -> None:
     """Set up Lince Euronet sensors from a config entry."""
-    api: LinceEuronetApi = config_entry.runtime_data
+    api: LinceEuronetApi = config_entry.runtime_data.api
     coordinator = LinceEuronetCoordinator(hass, config_entry, api)
+    config_entry.runtime_data.coordinators.append(coordinator)
     ingressi = await api.async_get_ingressi_config()  # Get sensor names from HTML once
 
     await coordinator.async_refresh()
@@ -11,12 +11,24 @@ from typing import Any
 import aiohttp
 import voluptuous as vol
 
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
 from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_USERNAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 
-from .const import DOMAIN
+from .const import (
+    CONF_REPLAY_PATH,
+    CONF_REPLAY_SPEED,
+    CONF_TRACE_PATH,
+    DOMAIN,
+    REPLAY_SPEED_INTERVAL,
+    REPLAY_SPEEDS,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,6 +41,16 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     }
 )
 
+OPTIONS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_TRACE_PATH): str,
+        vol.Optional(CONF_REPLAY_PATH): str,
+        vol.Optional(CONF_REPLAY_SPEED, default=REPLAY_SPEED_INTERVAL): vol.In(
+            REPLAY_SPEEDS
+        ),
+    }
+)
+
 
 class PlaceholderHub:
     """Placeholder class to make tests pass."""
@@ -74,6 +96,12 @@ class LinceEuronetConfigFlow(ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Get the options flow for this handler."""
+        return LinceEuronetOptionsFlow()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -185,5 +213,28 @@ class LinceEuronetConfigFlow(ConfigFlow, domain=DOMAIN):
         )
 
 
+class LinceEuronetOptionsFlow(OptionsFlow):
+    """Handle options for Lince Euronet trace recording and replay."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the trace options."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            # Replayed responses must not be recorded as if the panel sent them
+            if user_input.get(CONF_TRACE_PATH) and user_input.get(CONF_REPLAY_PATH):
+                errors["base"] = "replay_with_trace"
+            else:
+                return self.async_create_entry(data=user_input)
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(
+                OPTIONS_SCHEMA, user_input or self.config_entry.options
+            ),
+            errors=errors,
+        )
+
+
 class InvalidAuth(HomeAssistantError):
     """Error to indicate there is invalid auth."""
@@ -4,6 +4,17 @@ from homeassistant.helpers.entity import EntityCategory
 
 DOMAIN = "lince_euronet"
 
+# Options key enabling the trace recorder, relative to the config directory
+CONF_TRACE_PATH = "trace_path"
+# Options key replacing the panel with a recorded trace
+CONF_REPLAY_PATH = "replay_path"
+# Options key choosing how fast a replayed trace is fed to the entities
+CONF_REPLAY_SPEED = "replay_speed"
+REPLAY_SPEED_INTERVAL = "interval"
+REPLAY_SPEED_FAST = "fast"
+REPLAY_SPEED_REALTIME = "realtime"
+REPLAY_SPEEDS = [REPLAY_SPEED_INTERVAL, REPLAY_SPEED_FAST, REPLAY_SPEED_REALTIME]
+
 INGRESSI_COLUMNS = [
     "allarme_24h",
     "ingresso_aperto",
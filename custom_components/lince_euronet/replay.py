@@ -0,0 +1,160 @@
+"""Replay of recorded Lince Euronet traces.
+
+Feeds a trace written by the recorder back through the real parsers,
+coordinators and entities, without a live panel. A config entry replays
+a trace when its "replay_path" option is set, at the coordinators' own
+polling interval, as fast as possible or at the recorded pace depending
+on its "replay_speed" option.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Collection, Iterable, Mapping, Sequence
+import time
+from typing import TYPE_CHECKING
+
+from . import LinceEuronetApi
+from .trace import TraceRecord, read_trace, trace_files
+
+if TYPE_CHECKING:
+    from .coordinator import LinceEuronetCoordinator
+
+# Requests made once at setup rather than on every poll
+STATIC_PATHS = ("ingressi-filari.html",)
+
+
+class ReplayMiss(Exception):
+    """Error to indicate the trace has no recorded response for a request."""
+
+
+class RecordedError(Exception):
+    """Error to indicate the recorded exchange failed on the live panel."""
+
+
+class LinceEuronetReplayApi(LinceEuronetApi):
+    """API that answers requests from a recorded trace instead of the panel.
+
+    Polled requests consume the trace in recorded order. Requests for
+    static_paths are made only at setup, so they are answered from
+    static_responses or else from the last successful recorded response for
+    that path, without moving through the trace. With realtime, each
+    response takes as long as it took the live panel.
+    """
+
+    def __init__(
+        self,
+        records: Iterable[TraceRecord],
+        host: str = "replay",
+        static_paths: Collection[str] = STATIC_PATHS,
+        static_responses: Mapping[str, str] | None = None,
+        realtime: bool = False,
+    ) -> None:
+        """Initialize with recorded records and optional static responses."""
+        super().__init__(host, "", "")
+        self.realtime = realtime
+        self._records: list[TraceRecord] = []
+        self._static = dict(static_responses or {})
+        for record in records:
+            if record.path not in static_paths:
+                self._records.append(record)
+            elif record.error is None and record.path not in (static_responses or {}):
+                self._static[record.path] = record.text
+        self._pos = 0
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> LinceEuronetReplayApi:
+        """Load a trace including its rotated backups, oldest first."""
+        records = [record for file in trace_files(path) for record in read_trace(file)]
+        return cls(records, **kwargs)
+
+    @property
+    def position(self) -> int:
+        """Return the number of polled records replayed so far."""
+        return self._pos
+
+    @property
+    def next_record(self) -> TraceRecord | None:
+        """Return the next polled record to be replayed, if any."""
+        if self.exhausted:
+            return None
+        return self._records[self._pos]
+
+    @property
+    def exhausted(self) -> bool:
+        """Return True once every polled record has been replayed."""
+        return self._pos >= len(self._records)
+
+    async def _async_request(
+        self, method: str, path: str, payload: str | None = None
+    ) -> str:
+        """Return the recorded response for this request, or its error."""
+        if path in self._static:
+            return self._static[path]
+        # Skip records the replayed pipeline no longer asks for
+        for idx in range(self._pos, len(self._records)):
+            record = self._records[idx]
+            if (record.method, record.path, record.payload) == (method, path, payload):
+                break
+        else:
+            raise ReplayMiss(f"No recorded response for {method} {path} {payload}")
+        # Consumed before the latency wait: if the coordinator times out
+        # meanwhile, the live request timed out just the same
+        self._pos = idx + 1
+        if self.realtime:
+            await asyncio.sleep(record.elapsed)
+        if record.error is not None:
+            raise RecordedError(record.error)
+        return record.text
+
+
+async def async_replay(coordinators: Sequence[LinceEuronetCoordinator]) -> int:
+    """Drive coordinators sharing a replay API through the whole trace.
+
+    The first coordinator refreshes back to back until the trace is
+    exhausted or a refresh no longer advances it, and the others receive
+    each of its results, so every entity sees every recorded poll. With a
+    realtime API, each refresh waits until its first record is due relative
+    to the start of the trace, outside the coordinator's request timeout.
+    Scheduled polling is suspended meanwhile so the coordinators cannot
+    consume records of their own, and resumed afterwards.
+    Returns the number of refreshes performed.
+    """
+    leader, *followers = coordinators
+    api = leader.api
+    if not isinstance(api, LinceEuronetReplayApi):
+        raise TypeError("Coordinator is not backed by a replay API")
+    update_intervals = [coordinator.update_interval for coordinator in coordinators]
+    for coordinator in coordinators:
+        coordinator.update_interval = None
+        coordinator._async_unsub_refresh()  # noqa: SLF001
+    origin: float | None = None
+    clock = time.monotonic()
+    refreshes = 0
+    try:
+        while (record := api.next_record) is not None:
+            if api.realtime:
+                if origin is None:
+                    origin = record.started
+                delay = clock + record.started - origin - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            position = api.position
+            await leader.async_refresh()
+            refreshes += 1
+            for follower in followers:
+                if leader.last_update_success:
+                    follower.async_set_updated_data(leader.data)
+                elif leader.last_exception is not None:
+                    follower.async_set_update_error(leader.last_exception)
+            if api.position == position:
+                break
+    finally:
+        for coordinator, update_interval in zip(
+            coordinators, update_intervals, strict=True
+        ):
+            coordinator.update_interval = update_interval
+            # Mirrors the coordinator, which only polls while it has listeners
+            if coordinator._listeners:  # noqa: SLF001
+                coordinator._schedule_refresh()  # noqa: SLF001
+    return refreshes
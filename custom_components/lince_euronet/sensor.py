@@ -66,8 +66,9 @@ async def async_setup_entry(
     async_add_entities: AddConfigEntryEntitiesCallback,
 ) -> None:
     """Set up Lince Euronet sensors from a config entry."""
-    api: LinceEuronetApi = config_entry.runtime_data
+    api: LinceEuronetApi = config_entry.runtime_data.api
     coordinator = LinceEuronetCoordinator(hass, config_entry, api)
+    config_entry.runtime_data.coordinators.append(coordinator)
     await coordinator.async_refresh()
     entities = []
 
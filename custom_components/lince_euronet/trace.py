@@ -0,0 +1,207 @@
+"""Trace recording for the Lince Euronet integration.
+
+Every HTTP exchange with the panel can be appended to a gzip-compressed
+JSON-lines file, so real traffic can later be replayed offline. Failed
+exchanges are recorded too, with the error in place of a response.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+from datetime import datetime
+import gzip
+import json
+import logging
+import os
+import threading
+from typing import BinaryIO
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 3
+
+
+@dataclass(slots=True)
+class TraceRecord:
+    """A single request/response exchange with the panel."""
+
+    started: float
+    elapsed: float
+    method: str
+    path: str
+    payload: str | None
+    status: int
+    encoding: str
+    body: bytes
+    error: str | None = None
+
+    def to_line(self) -> str:
+        """Serialize the record as a compact JSON line."""
+        data = asdict(self)
+        # latin-1 maps every byte to one code point, so the body round-trips
+        data["body"] = self.body.decode("latin-1")
+        return json.dumps(data, separators=(",", ":")) + "\n"
+
+    @classmethod
+    def from_line(cls, line: str) -> TraceRecord:
+        """Deserialize a record written by to_line."""
+        data = json.loads(line)
+        data["body"] = data["body"].encode("latin-1")
+        return cls(**data)
+
+    @property
+    def text(self) -> str:
+        """Return the body decoded the same way the live request did."""
+        return self.body.decode(self.encoding)
+
+
+class TraceRecorder:
+    """Append-only trace writer with size based rotation."""
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backup_count: int = DEFAULT_BACKUP_COUNT,
+    ) -> None:
+        """Initialize the recorder; the file is opened on first write."""
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._lock = threading.Lock()
+        self._raw: BinaryIO | None = None
+        self._file: gzip.GzipFile | None = None
+        self._closed = False
+        self._pending: set[asyncio.Future[None]] = set()
+
+    async def async_record(self, record: TraceRecord) -> None:
+        """Append a record without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self.write, record)
+        except OSError as err:
+            _LOGGER.warning("LinceEuronet: Unable to write trace: %s", err)
+
+    def record_nowait(self, record: TraceRecord) -> None:
+        """Append a record in the executor without waiting for it.
+
+        Used where the caller cannot await, such as a cancelled request.
+        """
+        future = asyncio.get_running_loop().run_in_executor(None, self.write, record)
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        future.add_done_callback(_log_write_error)
+
+    async def async_close(self) -> None:
+        """Flush and close the trace file without blocking the event loop."""
+        # Let background writes of failed requests land before closing
+        await asyncio.gather(*self._pending, return_exceptions=True)
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    def write(self, record: TraceRecord) -> None:
+        """Append a record, rotating the file when it grows too large.
+
+        Records arriving after close, e.g. from a refresh still in flight
+        during unload, are dropped rather than starting a new file.
+        """
+        line = record.to_line().encode("utf-8")
+        with self._lock:
+            if self._closed:
+                return
+            if self._file is None:
+                self._open()
+            elif self._raw.tell() >= self.max_bytes:
+                self._close()
+                self._open()
+            self._file.write(line)
+            # Sync flush keeps everything written so far readable after a crash
+            self._file.flush()
+
+    def close(self) -> None:
+        """Flush and close the trace file; later writes are ignored."""
+        with self._lock:
+            self._closed = True
+            self._close()
+
+    def _open(self) -> None:
+        """Rotate any existing trace away and start a fresh file."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Never append to a previous session's file: it may lack a gzip trailer
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            self._rotate()
+        self._raw = open(self.path, "ab")  # noqa: SIM115
+        self._file = gzip.GzipFile(fileobj=self._raw, mode="ab")
+
+    def _close(self) -> None:
+        """Close the open trace file, if any."""
+        if self._file is not None:
+            self._file.close()
+            self._raw.close()
+            self._file = None
+            self._raw = None
+
+    def _rotate(self) -> None:
+        """Shift backups up by one, dropping the oldest."""
+        if self.backup_count <= 0:
+            os.remove(self.path)
+            return
+        for idx in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{idx}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{idx + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+
+def _log_write_error(future: asyncio.Future[None]) -> None:
+    """Log a failed background trace write."""
+    if not future.cancelled() and (err := future.exception()) is not None:
+        _LOGGER.warning("LinceEuronet: Unable to write trace: %s", err)
+
+
+def session_trace_path(path: str, started: datetime | None = None) -> str:
+    """Return the trace file for a session starting now, named after path.
+
+    The start time goes before the extensions, so "lince.jsonl.gz" becomes
+    "lince.20261018-093000.jsonl.gz" and restarts never rotate away the
+    traces of earlier sessions.
+    """
+    started = started or datetime.now()
+    directory, name = os.path.split(path)
+    stem, dot, extensions = name.partition(".")
+    name = f"{stem}.{started:%Y%m%d-%H%M%S}{dot}{extensions}"
+    return os.path.join(directory, name)
+
+
+def trace_files(path: str) -> list[str]:
+    """Return the existing files of a rotated trace, oldest first."""
+    files = []
+    idx = 1
+    while os.path.exists(f"{path}.{idx}"):
+        files.append(f"{path}.{idx}")
+        idx += 1
+    files.reverse()
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def read_trace(path: str) -> Iterator[TraceRecord]:
+    """Yield the records of a single trace file in recorded order.
+
+    A file that was not closed cleanly ends without a gzip trailer and may
+    have a partial last line; reading stops at the last complete record.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        try:
+            for line in file:
+                try:
+                    yield TraceRecord.from_line(line)
+                except ValueError:
+                    return
+        except EOFError:
+            return
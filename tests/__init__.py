@@ -0,0 +1 @@
+"""Tests for the Lince Euronet integration."""
@@ -0,0 +1,58 @@
+"""Helpers for Lince Euronet tests."""
+
+from custom_components.lince_euronet.trace import TraceRecord
+
+HOST = "192.168.1.50"
+
+INGRESSI_HTML = (
+    '<table class="table"><tbody>'
+    '<tr><th bgcolor="#eee">1 - Porta</th></tr>'
+    '<tr><th bgcolor="#eee">2 - Finestra</th></tr>'
+    "</tbody></table>"
+)
+
+
+def make_record(
+    started: float,
+    method: str,
+    path: str,
+    payload: str | None,
+    body: str,
+    elapsed: float = 0.05,
+) -> TraceRecord:
+    """Build a trace record for a successful exchange."""
+    return TraceRecord(
+        started=started,
+        elapsed=elapsed,
+        method=method,
+        path=path,
+        payload=payload,
+        status=200,
+        encoding="utf-8",
+        body=body.encode("utf-8"),
+    )
+
+
+def make_poll(
+    started: float, g_state: str, ingresso_aperto: int, elapsed: float = 0.05
+) -> list[TraceRecord]:
+    """Build the two exchanges of one coordinator poll."""
+    return [
+        make_record(
+            started,
+            "POST",
+            "status.xml",
+            "Sta=",
+            "<in_state>1%0%0%0%1350%105%2200%2300%1%0</in_state>"
+            f"<gstate>{g_state}</gstate>",
+            elapsed,
+        ),
+        make_record(
+            started + 0.1,
+            "POST",
+            "status.xml",
+            "Ing=0",
+            f"<in_state>0,{ingresso_aperto},0,0,0,</in_state>",
+            elapsed,
+        ),
+    ]
@@ -0,0 +1,61 @@
+"""Tests for the Lince Euronet config flow."""
+
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+
+from custom_components.lince_euronet.const import (
+    CONF_REPLAY_PATH,
+    CONF_REPLAY_SPEED,
+    CONF_TRACE_PATH,
+    DOMAIN,
+)
+from custom_components.lince_euronet.trace import TraceRecorder
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from .common import HOST, make_poll
+
+
+async def test_options_flow_reloads_entry(hass: HomeAssistant, tmp_path) -> None:
+    """Test the trace options can be set and reload the entry."""
+    path = str(tmp_path / "trace.jsonl.gz")
+    recorder = TraceRecorder(path)
+    for record in make_poll(1.0, "1", 1) + make_poll(11.0, "1", 1):
+        recorder.write(record)
+    recorder.close()
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"host": HOST, "username": "admin", "password": "admin"},
+        options={CONF_REPLAY_PATH: path},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "init"
+
+    # Replayed responses must not be recorded
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        user_input={CONF_REPLAY_PATH: path, CONF_TRACE_PATH: "lince.jsonl.gz"},
+    )
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {"base": "replay_with_trace"}
+
+    with patch.object(hass.config_entries, "async_reload") as reload:
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            user_input={CONF_REPLAY_PATH: path, CONF_REPLAY_SPEED: "fast"},
+        )
+        await hass.async_block_till_done()
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert entry.options == {CONF_REPLAY_PATH: path, CONF_REPLAY_SPEED: "fast"}
+    reload.assert_called_once_with(entry.entry_id)
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,323 @@
+"""Tests for replaying Lince Euronet traces."""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from custom_components.lince_euronet.const import (
+    CONF_REPLAY_PATH,
+    CONF_REPLAY_SPEED,
+    DOMAIN,
+    REPLAY_SPEED_FAST,
+)
+from custom_components.lince_euronet.coordinator import LinceEuronetCoordinator
+from custom_components.lince_euronet.replay import (
+    LinceEuronetReplayApi,
+    RecordedError,
+    ReplayMiss,
+    async_replay,
+)
+from custom_components.lince_euronet.trace import TraceRecord, TraceRecorder
+
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from .common import HOST, INGRESSI_HTML, make_poll, make_record
+
+
+@pytest.fixture
+def config_entry(hass: HomeAssistant) -> MockConfigEntry:
+    """Return a config entry added to hass."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"host": HOST, "username": "admin", "password": "admin"},
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+def write_trace(path: str, records: list[TraceRecord]) -> None:
+    """Write records to a closed trace file."""
+    recorder = TraceRecorder(path)
+    for record in records:
+        recorder.write(record)
+    recorder.close()
+
+
+async def test_replay_through_coordinator(
+    hass: HomeAssistant, config_entry: MockConfigEntry, tmp_path
+) -> None:
+    """Test a recorded trace replays through the coordinator in order."""
+    path = str(tmp_path / "trace.jsonl.gz")
+    write_trace(path, make_poll(1.0, "1", 1) + make_poll(11.0, "2S", 0))
+
+    api = LinceEuronetReplayApi.from_file(path, host=HOST)
+    coordinator = LinceEuronetCoordinator(hass, config_entry, api)
+    updates = []
+    unsub = coordinator.async_add_listener(
+        lambda: updates.append(dict(coordinator.data))
+    )
+
+    assert await async_replay([coordinator]) == 2
+    unsub()
+
+    assert api.exhausted
+    assert [update["g_state"] for update in updates] == ["1", "2S"]
+    assert [update["ingressi_state"][1] for update in updates] == [1, 0]
+    assert updates[0]["system_state"][4] == 1350
+    assert coordinator.update_interval == timedelta(seconds=10)
+
+
+async def test_replay_feeds_every_coordinator(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test coordinators sharing a replay API all see every recorded poll."""
+    api = LinceEuronetReplayApi(make_poll(1.0, "1", 1) + make_poll(2.0, "2", 0))
+    coordinators = [LinceEuronetCoordinator(hass, config_entry, api) for _ in range(2)]
+    updates: list[list[str]] = [[], []]
+    for coordinator, seen in zip(coordinators, updates, strict=True):
+        coordinator.async_add_listener(
+            lambda coordinator=coordinator, seen=seen: seen.append(
+                coordinator.data["g_state"]
+            )
+        )
+
+    assert await async_replay(coordinators) == 2
+
+    assert updates == [["1", "2"], ["1", "2"]]
+    for coordinator in coordinators:
+        await coordinator.async_shutdown()
+
+
+async def test_replay_suspends_and_resumes_polling(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test the coordinator's own polling waits for the replay to finish."""
+    api = LinceEuronetReplayApi(
+        make_poll(1.0, "1", 1, elapsed=0) + make_poll(61.0, "", 0, elapsed=0),
+        realtime=True,
+    )
+    coordinator = LinceEuronetCoordinator(hass, config_entry, api)
+    # The first listener schedules the coordinator's own polling
+    coordinator.async_add_listener(lambda: None)
+    positions = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay: float) -> None:
+        # asyncio.sleep is patched for hass too, which must keep working
+        if delay < 1:
+            await real_sleep(delay)
+            return
+        # Time passes for the rest of hass while the replay waits
+        position = api.position
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=30))
+        await hass.async_block_till_done()
+        positions.append((position, api.position))
+
+    with patch(
+        "custom_components.lince_euronet.replay.asyncio.sleep", side_effect=fake_sleep
+    ):
+        assert await async_replay([coordinator]) == 2
+
+    assert positions == [(2, 2)]
+    assert api.exhausted
+    assert coordinator.last_update_success
+
+    # Polling resumes afterwards; the exhausted trace now fails the refresh
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=70))
+    await hass.async_block_till_done()
+    assert not coordinator.last_update_success
+    assert isinstance(coordinator.last_exception.__cause__, ReplayMiss)
+    await coordinator.async_shutdown()
+
+
+async def test_replay_realtime_waits_outside_timeout(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test realtime gaps longer than the request timeout keep every record."""
+    api = LinceEuronetReplayApi(
+        make_poll(1.0, "1", 1, elapsed=0.2) + make_poll(61.0, "2", 0, elapsed=0.2),
+        realtime=True,
+    )
+    coordinator = LinceEuronetCoordinator(hass, config_entry, api)
+    delays = []
+
+    async def fake_sleep(delay: float) -> None:
+        delays.append(delay)
+
+    with patch(
+        "custom_components.lince_euronet.replay.asyncio.sleep", side_effect=fake_sleep
+    ):
+        assert await async_replay([coordinator]) == 2
+
+    assert api.exhausted
+    assert coordinator.last_update_success
+    assert coordinator.data["g_state"] == "2"
+    # Recorded latency for each request, and one gap between the polls
+    assert delays.count(0.2) == 4
+    gaps = [delay for delay in delays if delay != 0.2]
+    assert len(gaps) == 1
+    assert 59 < gaps[0] <= 60
+
+
+async def test_recorded_error_fails_refresh(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test a failed recorded exchange fails the replayed refresh."""
+    failed = TraceRecord(
+        started=11.0,
+        elapsed=10.0,
+        method="POST",
+        path="status.xml",
+        payload="Sta=",
+        status=0,
+        encoding="",
+        body=b"",
+        error="TimeoutError: ",
+    )
+    api = LinceEuronetReplayApi(
+        [*make_poll(1.0, "1", 1), failed, *make_poll(21.0, "2", 0)]
+    )
+    coordinator = LinceEuronetCoordinator(hass, config_entry, api)
+    results = []
+    coordinator.async_add_listener(
+        lambda: results.append(coordinator.last_update_success)
+    )
+
+    assert await async_replay([coordinator]) == 3
+
+    assert results == [True, False, True]
+    assert api.exhausted
+    await coordinator.async_shutdown()
+
+
+async def test_miss_keeps_position() -> None:
+    """Test an unmatched request leaves the rest of the trace available."""
+    records = make_poll(1.0, "1", 1)
+    api = LinceEuronetReplayApi(records)
+
+    with pytest.raises(ReplayMiss):
+        await api.get_xml(payload="Ing=9")
+    assert api.position == 0
+
+    assert await api.get_xml(payload="Sta=") == records[0].text
+    assert api.position == 1
+
+
+async def test_recorded_error_raises() -> None:
+    """Test the replay API re-raises a recorded failure."""
+    failed = make_record(1.0, "POST", "status.xml", "Sta=", "")
+    failed.error = "ClientConnectorError: refused"
+    api = LinceEuronetReplayApi([failed])
+
+    with pytest.raises(RecordedError, match="refused"):
+        await api.get_xml(payload="Sta=")
+    assert api.exhausted
+
+
+async def test_static_requests_do_not_consume_trace() -> None:
+    """Test setup-only requests are served from anywhere in the trace."""
+    polls = make_poll(1.0, "1", 1)
+    ingressi = make_record(5.0, "GET", "ingressi-filari.html", None, INGRESSI_HTML)
+    api = LinceEuronetReplayApi([*polls, ingressi])
+
+    assert await api.async_get_ingressi_config() == ["Porta", "Finestra"]
+    assert api.position == 0
+
+    # Callers can also supply the response when the trace lacks it
+    api = LinceEuronetReplayApi(
+        polls, static_responses={"ingressi-filari.html": "<html></html>"}
+    )
+    assert await api.async_get_ingressi_config() == []
+
+
+def _entity_ids(hass: HomeAssistant) -> tuple[str, str, str]:
+    """Return the G1, door and battery voltage entity ids."""
+    registry = er.async_get(hass)
+    return (
+        registry.async_get_entity_id(
+            "binary_sensor", DOMAIN, f"system_gstate_G1_{HOST}"
+        ),
+        registry.async_get_entity_id(
+            "binary_sensor", DOMAIN, "porta_ingresso_aperto_0"
+        ),
+        registry.async_get_entity_id("sensor", DOMAIN, f"system_number_vbatt_{HOST}"),
+    )
+
+
+async def test_replay_config_entry(hass: HomeAssistant, tmp_path) -> None:
+    """Test the replay_path option drives the entities at the poll interval."""
+    path = str(tmp_path / "trace.jsonl.gz")
+    records = [make_record(0.5, "GET", "ingressi-filari.html", None, INGRESSI_HTML)]
+    # One poll per coordinator at setup, then one each after the interval
+    for idx in range(4):
+        records += make_poll(1.0 + idx * 10, "1", 1)
+    write_trace(path, records)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"host": HOST, "username": "admin", "password": "admin"},
+        options={CONF_REPLAY_PATH: path},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    # Entities take their state from coordinator updates after being added
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=10))
+    await hass.async_block_till_done()
+
+    api = entry.runtime_data.api
+    assert isinstance(api, LinceEuronetReplayApi)
+    assert len(entry.runtime_data.coordinators) == 2
+    g1, door, vbatt = _entity_ids(hass)
+    assert hass.states.get(g1).state == "on"
+    assert hass.states.get(door).state == "on"
+    assert hass.states.get(vbatt).state == "13.5"
+    assert api.exhausted
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_replay_config_entry_fast(hass: HomeAssistant, tmp_path) -> None:
+    """Test a fast replay drives every entity through the whole trace."""
+    path = str(tmp_path / "trace.jsonl.gz")
+    records = [make_record(0.5, "GET", "ingressi-filari.html", None, INGRESSI_HTML)]
+    for idx in range(10):
+        records += make_poll(1.0 + idx * 10, "1" if idx < 9 else "", idx % 2)
+    write_trace(path, records)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"host": HOST, "username": "admin", "password": "admin"},
+        options={CONF_REPLAY_PATH: path, CONF_REPLAY_SPEED: REPLAY_SPEED_FAST},
+    )
+    entry.add_to_hass(hass)
+    g1_changes = []
+    hass.bus.async_listen(
+        "state_changed",
+        lambda event: (
+            g1_changes.append(event.data["new_state"].state)
+            if event.data["entity_id"].endswith("programma_stato_g1")
+            else None
+        ),
+    )
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert entry.runtime_data.api.exhausted
+    g1, door, vbatt = _entity_ids(hass)
+    # The last recorded poll reached both platforms' entities
+    assert hass.states.get(g1).state == "off"
+    assert hass.states.get(door).state == "on"
+    assert hass.states.get(vbatt).state == "13.5"
+    assert "on" in g1_changes
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
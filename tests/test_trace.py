@@ -0,0 +1,175 @@
+"""Tests for the Lince Euronet trace format and recorder."""
+
+from datetime import datetime
+import gzip
+import json
+import os
+from unittest.mock import patch
+
+import aiohttp
+import pytest
+
+from custom_components.lince_euronet import LinceEuronetApi
+from custom_components.lince_euronet.trace import (
+    TraceRecord,
+    TraceRecorder,
+    read_trace,
+    session_trace_path,
+    trace_files,
+)
+
+from .common import make_poll, make_record
+
+
+def test_record_round_trip() -> None:
+    """Test a record survives serialization byte for byte."""
+    record = TraceRecord(
+        started=1700000000.5,
+        elapsed=0.25,
+        method="GET",
+        path="ingressi-filari.html",
+        payload=None,
+        status=401,
+        encoding="iso-8859-1",
+        body=bytes(range(256)),
+    )
+    line = record.to_line()
+    assert line.endswith("\n")
+    assert "\n" not in line[:-1]
+    assert TraceRecord.from_line(line) == record
+
+
+def test_unclosed_file_reads_back(tmp_path) -> None:
+    """Test records are readable before the recorder is closed."""
+    path = str(tmp_path / "trace.jsonl.gz")
+    records = make_poll(1.0, "1", 1) + make_poll(11.0, "", 0)
+    recorder = TraceRecorder(path)
+    for record in records:
+        recorder.write(record)
+
+    assert list(read_trace(path)) == records
+
+    recorder.close()
+    assert list(read_trace(path)) == records
+
+
+def test_truncated_file_stops_cleanly(tmp_path) -> None:
+    """Test reading stops at the last complete record of a cut file."""
+    path = str(tmp_path / "trace.jsonl.gz")
+    records = make_poll(1.0, "1", 1)
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        for record in records:
+            file.write(record.to_line())
+        file.write(records[0].to_line()[:20])
+
+    assert list(read_trace(path)) == records
+
+    # Cut the compressed stream itself, as a crash mid-write would
+    with open(path, "rb") as file:
+        data = file.read()
+    with open(path, "wb") as file:
+        file.write(data[: len(data) // 2])
+
+    replayed = list(read_trace(path))
+    assert replayed == records[: len(replayed)]
+
+
+def test_rotation_keeps_backup_count(tmp_path) -> None:
+    """Test size rotation keeps at most backup_count old files."""
+    path = str(tmp_path / "trace.jsonl.gz")
+    recorder = TraceRecorder(path, max_bytes=200, backup_count=2)
+    records = [
+        make_record(
+            float(idx), "POST", "status.xml", "Sta=", f"<in_state>{idx}</in_state>"
+        )
+        for idx in range(100)
+    ]
+    for record in records:
+        recorder.write(record)
+    recorder.close()
+
+    assert trace_files(path) == [f"{path}.2", f"{path}.1", path]
+    assert not os.path.exists(f"{path}.3")
+    replayed = [record for file in trace_files(path) for record in read_trace(file)]
+    # The oldest records were dropped, the rest are contiguous and in order
+    assert replayed == records[-len(replayed) :]
+
+
+def test_new_session_rotates_previous_file(tmp_path) -> None:
+    """Test a new recorder never appends to an earlier session's file."""
+    path = str(tmp_path / "trace.jsonl.gz")
+    first = make_poll(1.0, "1", 1)
+    second = make_poll(100.0, "", 0)
+
+    crashed = TraceRecorder(path)
+    for record in first:
+        crashed.write(record)
+    # No close, as after a crash
+
+    recorder = TraceRecorder(path)
+    for record in second:
+        recorder.write(record)
+    recorder.close()
+
+    assert trace_files(path) == [f"{path}.1", path]
+    assert list(read_trace(f"{path}.1")) == first
+    assert list(read_trace(path)) == second
+    crashed.close()
+
+
+def test_write_after_close_is_ignored(tmp_path) -> None:
+    """Test a late write neither reopens nor rotates a closed trace."""
+    path = str(tmp_path / "trace.jsonl.gz")
+    records = make_poll(1.0, "1", 1)
+    recorder = TraceRecorder(path)
+    for record in records:
+        recorder.write(record)
+    recorder.close()
+
+    recorder.write(make_poll(11.0, "", 0)[0])
+
+    assert trace_files(path) == [path]
+    assert list(read_trace(path)) == records
+
+
+def test_session_trace_path() -> None:
+    """Test each session gets its own file named after the configured one."""
+    started = datetime(2026, 10, 18, 9, 30)
+    assert (
+        session_trace_path("/config/lince.jsonl.gz", started)
+        == "/config/lince.20261018-093000.jsonl.gz"
+    )
+    assert session_trace_path("lince", started) == "lince.20261018-093000"
+
+
+def test_record_without_error_field() -> None:
+    """Test records written before failures were traced still load."""
+    record = make_record(1.0, "POST", "status.xml", "Sta=", "<in_state>1</in_state>")
+    data = json.loads(record.to_line())
+    del data["error"]
+
+    assert TraceRecord.from_line(json.dumps(data)) == record
+
+
+async def test_failed_request_is_recorded(tmp_path) -> None:
+    """Test a failed exchange is traced with its error and re-raised."""
+    path = str(tmp_path / "trace.jsonl.gz")
+    recorder = TraceRecorder(path)
+    api = LinceEuronetApi("192.0.2.1", "admin", "admin", recorder=recorder)
+
+    with (
+        patch.object(
+            aiohttp.ClientSession,
+            "request",
+            side_effect=aiohttp.ClientConnectionError("refused"),
+        ),
+        pytest.raises(aiohttp.ClientConnectionError),
+    ):
+        await api.get_xml(payload="Sta=")
+    await api.async_close()
+
+    [record] = read_trace(path)
+    assert record.payload == "Sta="
+    assert record.error == "ClientConnectionError: refused"
+    assert record.body == b""
+    assert record.elapsed >= 0